@@ -22,6 +22,22 @@ PYBIND11_MODULE(sift, m)
           py::arg("xo"), py::arg("tau"), py::arg("TeSZ"), py::arg("betac_para"), py::arg("omega"), py::arg("sigma"),
            py::arg("kappa"), py::arg("betac2_perp"));
 
+    // batched version: evaluate the whole frequency grid with a single crossing
+    // of the binding layer instead of one python call per frequency
+    m.def("szpack_combo_means_batch",
+          [](const std::vector<double> & xo, double tau, double TeSZ, double betac_para,
+             double omega, double sigma, double kappa, double betac2_perp) {
+              std::vector<double> out(xo.size());
+              for (std::size_t i = 0; i < xo.size(); ++i) {
+                  out[i] = sift::compute_SZ_signal_combo_means(xo[i], tau, TeSZ, betac_para,
+                                                               omega, sigma, kappa, betac2_perp);
+              }
+              return out;
+          },
+          "Get SZ distortion for an array of frequencies",
+          py::arg("xo"), py::arg("tau"), py::arg("TeSZ"), py::arg("betac_para"), py::arg("omega"), py::arg("sigma"),
+           py::arg("kappa"), py::arg("betac2_perp"));
+
     // bind the opaque types
     sift::py::opaque(m);
     // register the exception types
@@ -1,10 +1,23 @@
+import functools
+import hashlib
+import math
+import os
 import numpy as np
 import camb
-import git
-from scipy.optimize import fsolve
+from multiprocessing import Pool
+from pathlib import Path
 from .flatsky import make_gaussian_realisation, get_lpf_hpf
 from .tools import get_bl, get_nl
-from .inpaint import get_covariance, inpainting
+from .inpaint import get_covariance, inpainting_batched
+
+# attempt to
+try:
+    # pull numba for the fused spectral kernels
+    from numba import njit, prange
+# if this fails
+except ImportError:
+    # indicate the compiled kernels are not accessible
+    njit = prange = None
 
 # Constants
 c = 299792458.0  # Speed of light - [c] = m/s
@@ -12,6 +25,53 @@ h_p = 6.626068e-34  # Planck's constant in SI units
 k_b = 1.38065e-23  # Boltzmann constant in SI units
 TCMB = 2.725  # Canonical CMB in Kelvin
 
+# Repository root, resolved relative to this file; avoids a GitPython lookup
+_REPO_ROOT = str(Path(__file__).resolve().parents[2])
+
+# Shared multipole grid and dl -> cl factor for the flat kSZ/tSZ spectra
+_EL_5051 = np.arange(5051)
+_DL_FAC_5051 = _EL_5051 * (_EL_5051 + 1.) / (2 * np.pi)
+_DL_FAC_5051[0] = np.inf  # so cl[0] = 0 falls out of the division
+
+
+if njit is not None:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _d_b_kernel(dt, frequency, out):
+        for i in prange(dt.shape[0]):
+            temp = TCMB / (1 + dt[i])
+            x = (h_p / (k_b * temp)) * frequency[i]
+            ex = math.exp(x)
+            em1 = ex - 1
+            I = ((2 * h_p) / (c ** 2)) * (k_b * temp / h_p) ** 3
+            out[i] = I * (x ** 4 * ex / (em1 * em1)) / temp * dt[i]
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _classical_tsz_kernel(y, frequency, out):
+        for i in prange(y.shape[0]):
+            x_b = (h_p / (k_b * TCMB)) * frequency[i]
+            ex = math.exp(x_b)
+            em1 = ex - 1
+            bv = 2 * k_b * TCMB * ((frequency[i] ** 2) / (c ** 2)) * (x_b / em1)
+            out[i] = y[i] * ((x_b * ex) / em1) * (x_b * ((ex + 1) / em1) - 4) * bv
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _invert_tsz_kernel(dt, frequency, out):
+        # slope of classical_tsz in y at this frequency, computed once
+        x_b = (h_p / (k_b * TCMB)) * frequency
+        ex_b = math.exp(x_b)
+        em1_b = ex_b - 1
+        bv = 2 * k_b * TCMB * ((frequency ** 2) / (c ** 2)) * (x_b / em1_b)
+        g = ((x_b * ex_b) / em1_b) * (x_b * ((ex_b + 1) / em1_b) - 4) * bv
+        # fused d_b evaluation and inversion, all intermediates in registers
+        for i in prange(dt.shape[0]):
+            temp = TCMB / (1 + dt[i])
+            x = (h_p / (k_b * temp)) * frequency
+            ex = math.exp(x)
+            em1 = ex - 1
+            I = ((2 * h_p) / (c ** 2)) * (k_b * temp / h_p) ** 3
+            out[i] = I * (x ** 4 * ex / (em1 * em1)) / temp * dt[i] / g
+
 
 def d_b(dt, frequency):
     """
@@ -24,10 +84,19 @@ def d_b(dt, frequency):
     dt = np.asanyarray(dt)
     frequency = np.asanyarray(frequency)
 
+    if njit is not None and (dt.size > 1 or frequency.size > 1):
+        dt_b, frequency_b = np.broadcast_arrays(dt, frequency)
+        out = np.empty(dt_b.size)
+        _d_b_kernel(np.ascontiguousarray(dt_b, dtype=np.float64).ravel(),
+                    np.ascontiguousarray(frequency_b, dtype=np.float64).ravel(), out)
+        return out.reshape(dt_b.shape)
+
     temp = TCMB / (1 + dt)
     x = (h_p / (k_b * temp)) * frequency
     I = ((2 * h_p) / (c ** 2)) * (k_b * temp / h_p) ** 3
-    return I * (x ** 4 * np.exp(x) / ((np.exp(x) - 1) ** 2)) / temp * dt
+    ex = np.exp(x)
+    em1 = ex - 1
+    return I * (x ** 4 * ex / (em1 * em1)) / temp * dt
 
 
 def classical_tsz(y, frequency):
@@ -41,9 +110,89 @@ def classical_tsz(y, frequency):
     y = np.asanyarray(y)
     frequency = np.asanyarray(frequency)
 
+    if njit is not None and (y.size > 1 or frequency.size > 1):
+        y_b, frequency_b = np.broadcast_arrays(y, frequency)
+        out = np.empty(y_b.size)
+        _classical_tsz_kernel(np.ascontiguousarray(y_b, dtype=np.float64).ravel(),
+                              np.ascontiguousarray(frequency_b, dtype=np.float64).ravel(), out)
+        return out.reshape(y_b.shape)
+
     x_b = (h_p / (k_b * TCMB)) * frequency
-    bv = 2 * k_b * TCMB * ((frequency ** 2) / (c ** 2)) * (x_b / (np.exp(x_b) - 1))
-    return y * ((x_b * np.exp(x_b)) / (np.exp(x_b) - 1)) * (x_b * ((np.exp(x_b) + 1) / (np.exp(x_b) - 1)) - 4) * bv
+    ex = np.exp(x_b)
+    em1 = ex - 1
+    bv = 2 * k_b * TCMB * ((frequency ** 2) / (c ** 2)) * (x_b / em1)
+    return y * ((x_b * ex) / em1) * (x_b * ((ex + 1) / em1) - 4) * bv
+
+
+@functools.lru_cache(maxsize=None)
+def _get_cl_tt(H0, ombh2, omch2, mnu, tau, As, ns, lmax):
+    """
+    Run CAMB for the given cosmology and return (el, cl_tt) in uK^2.
+    The result is memoized in memory and persisted under files/, so repeated
+    map generations with the same cosmology skip CAMB entirely.
+    """
+
+    # check the on-disk cache first
+    key = hashlib.sha1(repr((H0, ombh2, omch2, mnu, tau, As, ns, lmax)).encode()).hexdigest()
+    cachepath = _REPO_ROOT + '/files/camb_cl_tt_' + key + '.npz'
+    if os.path.exists(cachepath):
+        cached = np.load(cachepath)
+        return cached['el'], cached['cl_tt']
+
+    # Set up a new set of parameters for CAMB
+    pars = camb.CAMBparams()
+
+    # This function sets up with one massive neutrino and helium set using BBN consistency
+    pars.set_cosmology(H0=H0, ombh2=ombh2, omch2=omch2, mnu=mnu, omk=0, tau=tau)
+    pars.InitPower.set_params(As=As, ns=ns, r=0)
+    pars.set_for_lmax(lmax, lens_potential_accuracy=0)
+
+    # calculate results for these parameters
+    results = camb.get_results(pars)
+
+    # get dictionary of CAMB power spectra
+    powers = results.get_cmb_power_spectra(pars, CMB_unit='K')
+    totCL = powers['total']
+
+    el = np.arange(totCL.shape[0])
+    dl_tt = totCL[:, 0]
+    dl_tt[0] = 0
+    cl_tt = (dl_tt * 1e12 * 2 * np.pi / (el * (el + 1.)))  # Convert to uK
+
+    np.savez(cachepath, el=el, cl_tt=cl_tt)
+
+    return el, cl_tt
+
+
+@functools.lru_cache(maxsize=None)
+def _grid_cache(angular_resolution, boxsize_am, elmax):
+    """
+    Build the map geometry and the deterministic beam/noise/filter arrays for a given
+    resolution and box size. Cached because every create_*_map call needs the same arrays.
+    """
+
+    el = np.arange(elmax)
+
+    # params or supply a params file
+    dx = angular_resolution
+    nx = int(boxsize_am / dx)
+    mapparams = [nx, nx, dx, dx]
+    x1, x2 = -nx / 2. * dx, nx / 2. * dx
+
+    # beam and noise levels
+    noiseval = 1.0  # uK-arcmin
+    beamval = angular_resolution  # arcmins
+    bl = get_bl(beamval, el, make_2d=1, mapparams=mapparams)
+    nl = get_nl(noiseval, el)
+    lpf = get_lpf_hpf(mapparams, 3000, filter_type=0)
+
+    # get ra, dec or map-pixel grid; sparse grids broadcast against each other
+    # downstream without materializing two full nx x nx arrays
+    ra = np.linspace(x1, x2, nx)  # arcmins
+    dec = np.linspace(x1, x2, nx)  # arcmins
+    ra_grid, dec_grid = np.meshgrid(ra, dec, sparse=True)
+
+    return el, bl, nl, lpf, mapparams, ra_grid, dec_grid
 
 
 class Parameters:
@@ -58,85 +207,50 @@ class Parameters:
         """
 
         # Set a seed
-        np.random.seed(seed)
+        rng = np.random.default_rng(seed)
 
-        # Set up a new set of parameters for CAMB
-        pars = camb.CAMBparams()
-
-        # This function sets up with one massive neutrino and helium set using BBN consistency
-        pars.set_cosmology(H0=67.5, ombh2=0.022, omch2=0.122, mnu=0.06, omk=0, tau=0.06)
-        pars.InitPower.set_params(As=2e-9, ns=0.965, r=0)
-        lmax = 10000
-        pars.set_for_lmax(lmax, lens_potential_accuracy=0)
-
-        # calculate results for these parameters
-        results = camb.get_results(pars)
-
-        # get dictionary of CAMB power spectra
-        powers = results.get_cmb_power_spectra(pars, CMB_unit='K')
-        totCL = powers['total']
-
-        el = np.arange(totCL.shape[0])
-        dl_tt = totCL[:, 0]
-        dl_tt[0] = 0
-        cl_tt = (dl_tt * 1e12 * 2 * np.pi / (el * (el + 1.)))  # Convert to uK
+        # get the CAMB power spectrum, cached across calls
+        el, cl_tt = _get_cl_tt(H0=67.5, ombh2=0.022, omch2=0.122, mnu=0.06, tau=0.06,
+                               As=2e-9, ns=0.965, lmax=10000)
         cl_dic = {'TT': cl_tt}
 
-        # params or supply a params file
-        dx = angular_resolution
-        boxsize_am = 200.  # boxsize in arcmins
-        nx = int(boxsize_am / dx)
-        mapparams = [nx, nx, dx, dx]
-        x1, x2 = -nx / 2. * dx, nx / 2. * dx
-
-        # beam and noise levels
-        noiseval = 1.0  # uK-arcmin
-        beamval = angular_resolution  # arcmins
-        bl = get_bl(beamval, el, make_2d=1, mapparams=mapparams)
+        # get the map geometry, beam, noise and filter, cached across calls
+        el, bl, nl, lpf, mapparams, ra_grid, dec_grid = _grid_cache(angular_resolution, 200., el.size)
+        nl_dic = {'T': nl}
 
         # for inpainting
         noofsims = 1000
         mask_radius_inner = 7.5  # arcmins
         mask_radius_outer = 60  # arcmins
 
-        # get ra, dec or map-pixel grid
-        ra = np.linspace(x1, x2, nx)  # arcmins
-        dec = np.linspace(x1, x2, nx)  # arcmins
-        ra_grid, dec_grid = np.meshgrid(ra, dec)
-
-        # get beam and noise
-        nl_dic = {}
-        nl = [get_nl(noiseval, el)]
-        nl_dic['T'] = nl[0]
-        lpf = get_lpf_hpf(mapparams, 3000, filter_type=0)
-
-        cmb_map = np.asarray([make_gaussian_realisation(mapparams, el, cl_tt, bl=bl)])
-        noise_map = np.asarray([make_gaussian_realisation(mapparams, el, nl[0])])
+        # the downstream use is a single central pixel, so single precision is plenty
+        cmb_map = np.asarray([make_gaussian_realisation(mapparams, el, cl_tt, bl=bl, dtype=np.float32, rng=rng)])
+        noise_map = np.asarray([make_gaussian_realisation(mapparams, el, nl, dtype=np.float32, rng=rng)])
         sim_map = cmb_map + noise_map
 
         sigma_dic = get_covariance(ra_grid=ra_grid, dec_grid=dec_grid, mapparams=mapparams, el=el,
                                    cl_dic=cl_dic, bl=bl, lpf=lpf, nl_dic=nl_dic, noofsims=noofsims,
                                    mask_radius_inner=mask_radius_inner, mask_radius_outer=mask_radius_outer,
-                                   low_pass_cutoff=1)
-
-        cmb_anis = []
-        for i in range(realizations):
-            # perform inpainting
-            sim_map_dic = {'T': sim_map}
-            (cmb_inpainted_map, sim_map_inpainted,
-             sim_map_filtered) = inpainting(map_dic_to_inpaint=sim_map_dic,
-                                            ra_grid=ra_grid,
-                                            dec_grid=dec_grid,
-                                            mapparams=mapparams, el=el,
-                                            cl_dic=cl_dic, bl=bl, lpf=lpf,
-                                            nl_dic=nl_dic,
-                                            mask_radius_inner=mask_radius_inner,
-                                            mask_radius_outer=mask_radius_outer,
-                                            low_pass_cutoff=1,
-                                            sigma_dic=sigma_dic)
-            cmb_anis.append(sim_map_filtered[33:34, 33:34] - sim_map_inpainted[33:34, 33:34])
-
-        cmb_anis = np.asarray(cmb_anis).flatten()*1e-6
+                                   low_pass_cutoff=1, dtype=np.float32, rng=rng)
+
+        # perform inpainting for all realizations in one batched call
+        sim_map_dic = {'T': sim_map}
+        (cmb_inpainted_maps, sim_maps_inpainted,
+         sim_map_filtered) = inpainting_batched(map_dic_to_inpaint=sim_map_dic,
+                                                ra_grid=ra_grid,
+                                                dec_grid=dec_grid,
+                                                mapparams=mapparams, el=el,
+                                                cl_dic=cl_dic, bl=bl, lpf=lpf,
+                                                nl_dic=nl_dic,
+                                                mask_radius_inner=mask_radius_inner,
+                                                mask_radius_outer=mask_radius_outer,
+                                                realizations=realizations,
+                                                low_pass_cutoff=1,
+                                                sigma_dic=sigma_dic,
+                                                dtype=np.float32,
+                                                rng=rng)
+
+        cmb_anis = (sim_map_filtered[33, 33] - sim_maps_inpainted[:, 33, 33])*1e-6
         cmb_anis = cmb_anis - np.mean(cmb_anis)
 
         return cmb_anis
@@ -148,69 +262,49 @@ class Parameters:
         """
 
         # Set a seed
-        np.random.seed(seed)
-
-        el = np.arange(5051)
-        dl_tt = np.asanyarray([3] * 5051)  # Already in uK
-        dl_tt[0] = 0
-        cl_tt = (dl_tt * 2 * np.pi / (el * (el + 1.)))
-        cl_dic = {'TT': cl_tt}
+        rng = np.random.default_rng(seed)
 
-        # params or supply a params file
-        dx = angular_resolution
-        boxsize_am = 200.  # boxsize in arcmins
-        nx = int(boxsize_am / dx)
-        mapparams = [nx, nx, dx, dx]
-        x1, x2 = -nx / 2. * dx, nx / 2. * dx
+        # get the map geometry, beam, noise and filter, cached across calls
+        el, bl, nl, lpf, mapparams, ra_grid, dec_grid = _grid_cache(angular_resolution, 200., 5051)
+        nl_dic = {'T': nl}
 
-        # beam and noise levels
-        noiseval = 1.0  # uK-arcmin
-        beamval = angular_resolution  # arcmins
-        bl = get_bl(beamval, el, make_2d=1, mapparams=mapparams)
+        dl_tt = np.full(5051, 3.)  # Already in uK
+        cl_tt = dl_tt / _DL_FAC_5051
+        cl_dic = {'TT': cl_tt}
 
         # for inpainting
         noofsims = 1000
         mask_radius_inner = 7.5  # arcmins
         mask_radius_outer = 60  # arcmins
 
-        # get ra, dec or map-pixel grid
-        ra = np.linspace(x1, x2, nx)  # arcmins
-        dec = np.linspace(x1, x2, nx)  # arcmins
-        ra_grid, dec_grid = np.meshgrid(ra, dec)
-
-        # get beam and noise
-        nl_dic = {}
-        nl = [get_nl(noiseval, el)]
-        nl_dic['T'] = nl[0]
-        lpf = get_lpf_hpf(mapparams, 3000, filter_type=0)
-
-        ksz_map = np.asarray([make_gaussian_realisation(mapparams, el, cl_tt, bl=bl)])
-        noise_map = np.asarray([make_gaussian_realisation(mapparams, el, nl[0])])
+        # the downstream use is a single central pixel, so single precision is plenty
+        ksz_map = np.asarray([make_gaussian_realisation(mapparams, el, cl_tt, bl=bl, dtype=np.float32, rng=rng)])
+        noise_map = np.asarray([make_gaussian_realisation(mapparams, el, nl, dtype=np.float32, rng=rng)])
         sim_map = ksz_map + noise_map
 
         sigma_dic = get_covariance(ra_grid=ra_grid, dec_grid=dec_grid, mapparams=mapparams, el=el,
                                    cl_dic=cl_dic, bl=bl, lpf=lpf, nl_dic=nl_dic, noofsims=noofsims,
                                    mask_radius_inner=mask_radius_inner, mask_radius_outer=mask_radius_outer,
-                                   low_pass_cutoff=1)
-
-        ksz_anis = []
-        for i in range(realizations):
-            # perform inpainting
-            sim_map_dic = {'T': sim_map}
-            (ksz_inpainted_map, sim_map_inpainted,
-             sim_map_filtered) = inpainting(map_dic_to_inpaint=sim_map_dic,
-                                            ra_grid=ra_grid,
-                                            dec_grid=dec_grid,
-                                            mapparams=mapparams, el=el,
-                                            cl_dic=cl_dic, bl=bl, lpf=lpf,
-                                            nl_dic=nl_dic,
-                                            mask_radius_inner=mask_radius_inner,
-                                            mask_radius_outer=mask_radius_outer,
-                                            low_pass_cutoff=1,
-                                            sigma_dic=sigma_dic)
-            ksz_anis.append(sim_map_filtered[33:34, 33:34] - sim_map_inpainted[33:34, 33:34])
-
-        ksz_anis = np.asarray(ksz_anis).flatten()*1e-6  # Convert back to Kelvin
+                                   low_pass_cutoff=1, dtype=np.float32, rng=rng)
+
+        # perform inpainting for all realizations in one batched call
+        sim_map_dic = {'T': sim_map}
+        (ksz_inpainted_maps, sim_maps_inpainted,
+         sim_map_filtered) = inpainting_batched(map_dic_to_inpaint=sim_map_dic,
+                                                ra_grid=ra_grid,
+                                                dec_grid=dec_grid,
+                                                mapparams=mapparams, el=el,
+                                                cl_dic=cl_dic, bl=bl, lpf=lpf,
+                                                nl_dic=nl_dic,
+                                                mask_radius_inner=mask_radius_inner,
+                                                mask_radius_outer=mask_radius_outer,
+                                                realizations=realizations,
+                                                low_pass_cutoff=1,
+                                                sigma_dic=sigma_dic,
+                                                dtype=np.float32,
+                                                rng=rng)
+
+        ksz_anis = (sim_map_filtered[33, 33] - sim_maps_inpainted[:, 33, 33])*1e-6  # Convert back to Kelvin
         ksz_anis = ksz_anis - np.mean(ksz_anis)  # Normalize a little bit
 
         return ksz_anis
@@ -222,37 +316,33 @@ class Parameters:
         """
 
         # Set a seed
-        np.random.seed(seed)
+        rng = np.random.default_rng(seed)
 
         # Flat power spectrum
         frequency = 143e9
 
-        el = np.arange(5051)
-        dl_tt = np.asanyarray([3.42] * 5051)  # Already in uK
-        dl_tt[0] = 0
-        cl_tt = (dl_tt * 2 * np.pi / (el * (el + 1.)))
+        # get the map geometry and beam, cached across calls
+        el, bl, nl, lpf, mapparams, ra_grid, dec_grid = _grid_cache(angular_resolution, 3000., 5051)
+        nx = mapparams[0]
 
-        # params or supply a params file
-        dx = angular_resolution
-        boxsize_am = 3000.  # boxsize in arcmins
-        nx = int(boxsize_am / dx)
-        mapparams = [nx, nx, dx, dx]
+        dl_tt = np.full(5051, 3.42)  # Already in uK
+        cl_tt = dl_tt / _DL_FAC_5051
 
-        beamval = angular_resolution  # arcmins
-        bl = get_bl(beamval, el, make_2d=1, mapparams=mapparams)
-
-        def func(y_value, dt):
-            return classical_tsz(y=y_value, frequency=frequency) - d_b(dt=dt, frequency=frequency)
-
-        tsz_anis = []
+        dts = np.empty(realizations)
         for i in range(realizations):
 
-            TSZ_map = np.asarray([make_gaussian_realisation(mapparams, el, cl_tt, bl=bl)])
+            TSZ_map = np.asarray([make_gaussian_realisation(mapparams, el, cl_tt, bl=bl, dtype=np.float32, rng=rng)])
             TSZ_T = TSZ_map.reshape(nx, nx) * 1e-6  # Convert to K
 
-            tsz_anis.append(fsolve(func=func, x0=np.asarray([0]), args=[np.asarray(TSZ_T[33, 33])]))
+            dts[i] = TSZ_T[33, 33]
 
-        tsz_anis = np.asarray(tsz_anis).flatten()
+        # classical_tsz is linear in y at fixed frequency, so inverting
+        # classical_tsz(y) = d_b(dt) is a division by the slope classical_tsz(1)
+        if njit is not None:
+            tsz_anis = np.empty(realizations)
+            _invert_tsz_kernel(dts, frequency, tsz_anis)
+        else:
+            tsz_anis = d_b(dt=dts, frequency=frequency) / classical_tsz(y=1.0, frequency=frequency)
         tsz_anis = tsz_anis - np.mean(tsz_anis)  # Normalize a little bit
 
         return tsz_anis
@@ -265,29 +355,30 @@ class Parameters:
         :return None:
         """
 
-        params = [[0, 0, 0, 0, 0]]
-        params = np.asarray(params)
-
-        # Get CMB anisotropies
-        amp_cmb = self.create_cmb_map(angular_resolution=angular_resolution, realizations=realizations)
-
-        # Create secondary kSZ, tSZ map
-        amp_ksz = self.create_ksz_map(angular_resolution=angular_resolution, realizations=realizations)
-        amp_tsz = self.create_tsz_map(angular_resolution=angular_resolution, realizations=realizations)
-
-        # Make realizations
-        for i in range(realizations):
-            # Pick coordinates of SIDES continuum
-            # Low and high defined by shape of SIDES catalog given
-            sides_long = np.random.randint(low=0, high=160)
-            sides_lat = np.random.randint(low=0, high=160)
-
-            params_realization = [[sides_long, sides_lat, amp_cmb[i], amp_ksz[i], amp_tsz[i]]]
-            params = np.append(arr=params, values=params_realization, axis=0)
-
-        params = params[1:, :]
-
-        repo = git.Repo('.', search_parent_directories=True)
+        # The CMB, kSZ and tSZ maps are independent, so generate them in parallel
+        with Pool(processes=3) as pool:
+            cmb_job = pool.apply_async(self.create_cmb_map,
+                                       kwds={'angular_resolution': angular_resolution,
+                                             'realizations': realizations})
+            ksz_job = pool.apply_async(self.create_ksz_map,
+                                       kwds={'angular_resolution': angular_resolution,
+                                             'realizations': realizations})
+            tsz_job = pool.apply_async(self.create_tsz_map,
+                                       kwds={'angular_resolution': angular_resolution,
+                                             'realizations': realizations})
+
+            # Get CMB anisotropies and secondary kSZ, tSZ anisotropies
+            amp_cmb = cmb_job.get()
+            amp_ksz = ksz_job.get()
+            amp_tsz = tsz_job.get()
+
+        # Pick coordinates of SIDES continuum for all realizations at once
+        # Low and high defined by shape of SIDES catalog given
+        rng = np.random.default_rng()
+        sides_long = rng.integers(low=0, high=160, size=realizations)
+        sides_lat = rng.integers(low=0, high=160, size=realizations)
+
+        params = np.column_stack((sides_long, sides_lat, amp_cmb, amp_ksz, amp_tsz))
 
         # Write simulation output, change directory/name
-        np.save(repo.working_tree_dir + '/files/parameter_file_' + str(realizations), arr=params, allow_pickle=True)
+        np.save(_REPO_ROOT + '/files/parameter_file_' + str(realizations), arr=params)
@@ -6,8 +6,8 @@ import sift
 from astropy.io import fits
 import pandas as pd
 from scipy.interpolate import interp1d
-import git
 import os
+from pathlib import Path
 import h5py
 
 # Constants
@@ -21,6 +21,10 @@ TCMB = 2.725  # Canonical CMB in Kelvin
 m = 9.109 * 10 ** (-31)  # Electron mass in kgs
 KeVtoKelvin = 11604525.0061598  # Conversion from KeV to Kelvin
 
+# Repository root, resolved relative to this file; avoids a GitPython lookup
+# on every spectrum evaluation
+_REPO_ROOT = str(Path(__file__).resolve().parents[2])
+
 
 def d_b(dt, frequency):
     """
@@ -33,7 +37,9 @@ def d_b(dt, frequency):
     temp = TCMB / (1 + dt)
     x = (h_p / (k_b * temp)) * frequency
     I = ((2 * h_p) / (c ** 2)) * (k_b * temp / h_p) ** 3
-    return I * (x ** 4 * np.exp(x) / ((np.exp(x) - 1) ** 2)) / temp * dt
+    ex = np.exp(x)
+    em1 = ex - 1
+    return I * (x ** 4 * ex / (em1 * em1)) / temp * dt
 
 
 def szpack_signal(frequency, tau, temperature, peculiar_velocity):
@@ -61,8 +67,10 @@ def classical_tsz(y, frequency):
     """
 
     x_b = (h_p / (k_b * TCMB)) * frequency
-    bv = 2 * k_b * TCMB * ((frequency ** 2) / (c ** 2)) * (x_b / (np.exp(x_b) - 1))
-    return y * ((x_b * np.exp(x_b)) / (np.exp(x_b) - 1)) * (x_b * ((np.exp(x_b) + 1) / (np.exp(x_b) - 1)) - 4) * bv
+    ex = np.exp(x_b)
+    em1 = ex - 1
+    bv = 2 * k_b * TCMB * ((frequency ** 2) / (c ** 2)) * (x_b / em1)
+    return y * ((x_b * ex) / em1) * (x_b * ((ex + 1) / em1) - 4) * bv
 
 
 def sides_continuum(freq, long, lat, angular_resolution=3.0):
@@ -76,8 +84,7 @@ def sides_continuum(freq, long, lat, angular_resolution=3.0):
     """
 
     # Read FITS file
-    repo = git.Repo('.', search_parent_directories=True)
-    fname = repo.working_tree_dir + '/files/continuum.fits'
+    fname = _REPO_ROOT + '/files/continuum.fits'
     hdu = fits.open(name=fname)
     image_data = hdu[0].data
 
@@ -104,8 +111,7 @@ def sides_average(freq, a_sides, b_sides):
     """
 
     # Read SIDES average model
-    repo = git.Repo('.', search_parent_directories=True)
-    df = pd.read_csv(filepath_or_buffer=repo.working_tree_dir + '/files/sides.csv', header=None)
+    df = pd.read_csv(filepath_or_buffer=_REPO_ROOT + '/files/sides.csv', header=None)
     data = df.to_numpy()
     data = data.squeeze()
     SIDES = data * MJyperSrtoSI
@@ -381,17 +387,13 @@ class Simulation:
         :return None, saves run.
         """
 
-        repo = git.Repo('.', search_parent_directories=True)
-
-        if os.path.exists(repo.working_tree_dir + '/files/parameter_file_' + str(realizations) + '.npy'):
+        if os.path.exists(_REPO_ROOT + '/files/parameter_file_' + str(realizations) + '.npy'):
             # Read saved parameters file
-            params = np.load(file=repo.working_tree_dir + '/files/parameter_file_' + str(realizations) + '.npy',
-                             allow_pickle=True)
+            params = np.load(file=_REPO_ROOT + '/files/parameter_file_' + str(realizations) + '.npy')
         else:
             parameters = sift.parameters()
             parameters.create_parameter_file(angular_resolution=self.angular_resolution, realizations=realizations)
-            params = np.load(file=repo.working_tree_dir + '/files/parameter_file_' + str(realizations) + '.npy',
-                             allow_pickle=True)
+            params = np.load(file=_REPO_ROOT + '/files/parameter_file_' + str(realizations) + '.npy')
 
         samples = [[0, 0, 0, 0, 0]]
         samples = np.asarray(samples)
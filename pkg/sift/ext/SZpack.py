@@ -24,16 +24,27 @@ class SZpack:
 
     def sz_combo_means(self, x):
         """
-
+        Evaluate the SZ signal over the frequency grid {x} with a single crossing
+        of the binding layer, when the batched entry point is available.
         """
 
-        output = []
-        for xo in x:
-            output.append(sift.libsift.szpack_combo_means(xo=xo, tau=self.tau, TeSZ=self.TeSZ,
-                                                          betac_para=self.betac_para,
-                                                          omega=self.omega, sigma=self.sigma, kappa=self.kappa,
-                                                          betac2_perp=self.betac2_perp))
+        x = np.atleast_1d(np.asanyarray(x, dtype=np.float64))
+
+        if hasattr(sift.libsift, 'szpack_combo_means_batch'):
+            output = sift.libsift.szpack_combo_means_batch(xo=x.tolist(), tau=self.tau, TeSZ=self.TeSZ,
+                                                           betac_para=self.betac_para,
+                                                           omega=self.omega, sigma=self.sigma, kappa=self.kappa,
+                                                           betac2_perp=self.betac2_perp)
+            return np.asanyarray(output)
+
+        # older builds of the bindings: one call per frequency
+        output = np.empty(x.size)
+        for i, xo in enumerate(x):
+            output[i] = sift.libsift.szpack_combo_means(xo=xo, tau=self.tau, TeSZ=self.TeSZ,
+                                                        betac_para=self.betac_para,
+                                                        omega=self.omega, sigma=self.sigma, kappa=self.kappa,
+                                                        betac2_perp=self.betac2_perp)
 
-        return np.asanyarray(output)
+        return output
 
 # end of file
@@ -31,9 +31,12 @@ def get_mask_indices(ra_grid, dec_grid, mask_radius_inner, mask_radius_outer, sq
 
 
 def get_covariance(ra_grid, dec_grid, mapparams, el, cl_dic, bl, nl_dic, noofsims, mask_radius_inner, mask_radius_outer, lpf,
-                   low_pass_cutoff=1):
+                   low_pass_cutoff=1, dtype=None, rng=None):
     print('\n\tcalculating the covariance from simulations for inpainting')
 
+    if dtype is not None:
+        lpf = lpf.astype(dtype)
+
     # get the sims for covariance calculation
     print('\n\t\tgenerating %s sims' % noofsims)
 
@@ -41,14 +44,14 @@ def get_covariance(ra_grid, dec_grid, mapparams, el, cl_dic, bl, nl_dic, noofsim
     for n in range(noofsims):
 
         # cmb sim and beam, for CMB include the transfer function and beam
-        cmb_map = make_gaussian_realisation(mapparams, el, cl_dic['TT'], bl=bl)
+        cmb_map = make_gaussian_realisation(mapparams, el, cl_dic['TT'], bl=bl, dtype=dtype, rng=rng)
 
-        noise_map = make_gaussian_realisation(mapparams, el, nl_dic['T'])
+        noise_map = make_gaussian_realisation(mapparams, el, nl_dic['T'], dtype=dtype, rng=rng)
         sim_map = cmb_map + noise_map
 
         # lpf the map
         if low_pass_cutoff:
-            sim_map = np.fft.ifft2(np.fft.fft2(sim_map) * lpf).real
+            sim_map = sc.fft.ifft2(sc.fft.fft2(sim_map) * lpf).real
 
         sims_for_covariance.append(sim_map)
 
@@ -147,3 +150,69 @@ def inpainting(map_dic_to_inpaint, ra_grid, dec_grid, mapparams, el, cl_dic, bl,
     cmb_inpainted_map[inds_inner[0], inds_inner[1]] = inpainted_t1_tqu_split
 
     return cmb_inpainted_map, inpainted_map, map_to_inpaint
+
+
+def inpainting_batched(map_dic_to_inpaint, ra_grid, dec_grid, mapparams, el, cl_dic, bl, nl_dic, mask_radius_inner,
+                       lpf, mask_radius_outer, realizations, low_pass_cutoff=1, sigma_dic=None, dtype=None, rng=None):
+    """
+    Batched version of inpainting: draws all constrained realisations up front as an
+    (R, nx, nx) stack and applies the covariance correction to every realisation with
+    a single matrix product instead of one solve per call.
+    """
+
+    sigma_12 = sigma_dic['sigma_12']
+    sigma_22_inv = sigma_dic['sigma_22_inv']
+
+    # the correction operator is shared by all realisations
+    correction_op = np.asarray(np.dot(sigma_12, sigma_22_inv))
+
+    if dtype is not None:
+        lpf = lpf.astype(dtype)
+        correction_op = correction_op.astype(dtype)
+
+    # get the inner and outer pixel indices
+    inds_inner, inds_outer = get_mask_indices(ra_grid, dec_grid, mask_radius_inner, mask_radius_outer)
+
+    tqukeys = ['T']
+
+    map_to_inpaint = []
+    for tqu in tqukeys:
+        map_to_inpaint.append(map_dic_to_inpaint[tqu])
+    map_to_inpaint = np.asarray(map_to_inpaint)
+    if dtype is not None:
+        map_to_inpaint = map_to_inpaint.astype(dtype, copy=False)
+
+    # lpf the map
+    if low_pass_cutoff:
+        map_to_inpaint = sc.fft.ifft2(sc.fft.fft2(map_to_inpaint) * lpf).real
+
+    # get the pixel values in the outer region of the data map
+    map_to_inpaint = map_to_inpaint.reshape(np.shape(map_to_inpaint)[2], np.shape(map_to_inpaint)[2])
+    t2_data = map_to_inpaint[inds_outer[0], inds_outer[1]].flatten()
+
+    # generate all constrained Gaussian CMB realisations up front
+    nx = np.shape(map_to_inpaint)[0]
+    constrained_sims = np.empty((realizations, nx, nx), dtype=dtype)
+    for i in range(realizations):
+        cmb_map = make_gaussian_realisation(mapparams, el, cl_dic['TT'], bl=bl, dtype=dtype, rng=rng)
+        noise_map = make_gaussian_realisation(mapparams, el, nl_dic['T'], dtype=dtype, rng=rng)
+        constrained_sims[i] = cmb_map + noise_map
+
+    # lpf the whole stack in one shot
+    if low_pass_cutoff:
+        constrained_sims = sc.fft.ifft2(sc.fft.fft2(constrained_sims, axes=(-2, -1)) * lpf, axes=(-2, -1)).real
+
+    t1_tilde = constrained_sims[:, inds_inner[0], inds_inner[1]]
+    t2_tilde = constrained_sims[:, inds_outer[0], inds_outer[1]]
+
+    # get the modified t1 values for every realisation with one GEMM  # Eq. 36
+    inpainted_t1 = t1_tilde + np.dot(t2_data[np.newaxis, :] - t2_tilde, correction_op.T)
+
+    # create the inpainted maps: copy the filtered map and replace the t1 region
+    inpainted_maps = np.broadcast_to(map_to_inpaint, (realizations, nx, nx)).copy()
+    inpainted_maps[:, inds_inner[0], inds_inner[1]] = inpainted_t1
+
+    cmb_inpainted_maps = np.zeros((realizations, nx, nx), dtype=map_to_inpaint.dtype)
+    cmb_inpainted_maps[:, inds_inner[0], inds_inner[1]] = inpainted_t1
+
+    return cmb_inpainted_maps, inpainted_maps, map_to_inpaint